@@ -20,9 +20,10 @@
 # system imports
 
 import os, wx, re, copy
-# TODO: if _thread does not work, use threading
-import time, _thread, tempfile, subprocess, signal
-import sys
+import time, tempfile, subprocess, signal
+import sys, traceback
+import threading
+import concurrent.futures
 
 # local imports
 
@@ -45,33 +46,40 @@ from options import (
 # Moved this import to avoid circular dependency
 # from my_setup import Setup_tabs
 
+# Worker threads for running searches are kept and reused, rather than
+# starting a new thread for each one.  At most one Prover9 and one Mace4
+# search run at a time, so a search never waits for a worker.
+
+job_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4,
+                                                 thread_name_prefix='job')
+
 def run_and_wait(command, input = '', fin = None):
 
-    if not fin:
-        fin  = tempfile.TemporaryFile('w+b')  # stdin
+    # Pipes rather than temporary files: communicate() feeds stdin and
+    # drains stdout/stderr together, so neither side can block.
+    # If the caller supplies fin, it is used as stdin and left open.
+
+    if fin:
+        stdin = fin
+        input = None
+    else:
+        stdin = subprocess.PIPE
         if isinstance(input, str):
             input = input.encode('utf-8')
-        fin.write(input)
-        fin.seek(0)
-
-    fout = tempfile.TemporaryFile('w+b')  # stdout
-    ferr = tempfile.TemporaryFile('w+b')  # stderr
 
     if Win32():
         # creationflag says not to pop a DOS box
-        process = subprocess.Popen(command,stdin=fin,stdout=fout,stderr=ferr,
-                                  creationflags=win32process.CREATE_NO_WINDOW)
+        process = subprocess.Popen(command, stdin=stdin,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE,
+                                   creationflags=win32process.CREATE_NO_WINDOW)
     else:
-        process = subprocess.Popen(command,stdin=fin,stdout=fout,stderr=ferr)
-
-    exit_code = process.wait()
-    fout.seek(0)
-    output = fout.read()
-    ferr.seek(0)
-    error = ferr.read()
-    fin.close()
-    fout.close()
-    ferr.close()
+        process = subprocess.Popen(command, stdin=stdin,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+
+    (output, error) = process.communicate(input)
+    exit_code = process.returncode
     return (exit_code, output, error)  # Return raw bytes - let caller handle decoding
 
 def isofilter_command(program_name):
@@ -81,6 +89,8 @@ def isofilter_command(program_name):
     else:
         return [fullpath]
 
+r_op_in_interp = re.compile(r'(?:function|relation)\(([^,(]*)')
+
 def ops_in_interp(s):
     # Convert bytes to string if needed
     if isinstance(s, bytes):
@@ -90,17 +100,55 @@ def ops_in_interp(s):
     ops = []
     if i >= 0:
         j = s.find(').', i+1)
-        interp = s[i:j+2]
-        r = re.compile(r'(?:function|relation)\(([^,(]*)')
-        m = r.search(interp)
-        while m:
+        # Scan only the first interpretation, in place and in one pass.
+        for m in r_op_in_interp.finditer(s, i, j+2):
             op = m.group(1)
             if op != '=':
                 ops.append(op)
-            m = r.search(interp, m.end())
     return ops
     
-class Prover9:
+class Program:
+
+    # Behavior shared by Prover9 and Mace4.  A subclass supplies the
+    # names, logo, binary paths, solution marker, and exit messages.
+
+    search_args = []
+    logo = None  # bitmap, decoded on first use and then shared
+
+    def search_command(self):
+        if not binary_ok(self.search_path):
+            return None
+        else:
+            return [self.search_path] + self.search_args
+
+    def success_command(self):
+        if not binary_ok(self.success_path):
+            return None
+        else:
+            return [self.success_path]
+
+    def exists_solution(self, exit_code, output):
+        # output is the raw stdout; look for the marker without decoding it
+        return output.find(self.solution_marker) >= 0
+
+    def exit_message(self, code):
+        return self.exits.get(code, 'unknown exit code: %d' % code)
+
+    def logo_bitmap(self):
+        cls = type(self)  # cache on the subclass, one logo per program
+        if cls.logo:
+            return cls.logo
+        elif not os.access(self.logo_path, os.R_OK):
+            error_dialog('The logo file %s cannot be found.' % self.logo_path)
+            return None
+        else:
+            cls.logo = wx.Image(self.logo_path,
+                                wx.BITMAP_TYPE_GIF).ConvertToBitmap()
+            return cls.logo
+
+# end class Program
+
+class Prover9(Program):
 
     name = 'Prover9'
     solution_name = 'Proof'
@@ -110,6 +158,10 @@ class Prover9:
 
     logo_path = os.path.join(image_dir(), 'prover9-5a-128t.gif')
 
+    search_path = os.path.join(bin_dir(), 'prover9')
+    success_path = os.path.join(bin_dir(), 'prooftrans')
+    solution_marker = b'== PROOF =='
+
     # Compile regular expression for extracting stats from stderr.
 
     r_info = re.compile(r'Given=(\d+)\. Generated=(\d+)\. Kept=(\d+)\. '
@@ -129,43 +181,9 @@ class Prover9:
     exits[-9]  = 'Killed' # Linux, Mac
     exits[-1]  = 'Killed' # Win32
 
-    def search_command(self):
-        fullpath = os.path.join(bin_dir(), 'prover9')
-        if not binary_ok(fullpath):
-            return None
-        else:
-            return [fullpath]
-
-    def success_command(self):
-        fullpath = os.path.join(bin_dir(), 'prooftrans')
-        if not binary_ok(fullpath):
-            return None
-        else:
-            return [fullpath]
-
-    def exists_solution(self, exit_code, output):
-        # Handle bytes objects by decoding them to strings
-        if isinstance(output, bytes):
-            output = output.decode('utf-8', errors='replace')
-        return output.find('== PROOF ==') >= 0
-
     def count_solutions(self, solutions):
         return solutions.count('== PROOF ==')
 
-    def exit_message(self, code):
-        if code in self.exits.keys():
-            return self.exits[code]
-        else:
-            return 'unknown exit code: %d' % code
-
-    def logo_bitmap(self):
-        if not os.access(self.logo_path, os.R_OK):
-            error_dialog('The logo file %s cannot be found.' % self.logo_path)
-            return None
-        else:
-            return wx.Image(self.logo_path,
-                            wx.BITMAP_TYPE_GIF).ConvertToBitmap()
-
     def get_info_from_stderr(self, lines):
         stats = utilities.grep_last('Given', lines)
         time  = utilities.grep_last('User_CPU', lines)
@@ -193,7 +211,7 @@ class Prover9:
         
 # end class Prover9
 
-class Mace4:
+class Mace4(Program):
 
     name = 'Mace4'
     solution_name = 'Model'
@@ -202,6 +220,11 @@ class Mace4:
     some_message = ''
 
     logo_path = os.path.join(image_dir(), 'mace4-90t.gif')
+
+    search_path = os.path.join(bin_dir(), 'mace4')
+    search_args = ['-c']
+    success_path = os.path.join(bin_dir(), 'interpformat')
+    solution_marker = b'== MODEL =='
     
     # Compile regular expression for extracting stats from stderr.
     # Domain_size=8. Models=0. User_CPU=8.00.
@@ -221,43 +244,9 @@ class Mace4:
     exits[-9]  = 'Killed' # Linux, Mac
     exits[-1]  = 'Killed' # Win32
 
-    def search_command(self):
-        fullpath = os.path.join(bin_dir(), 'mace4')
-        if not binary_ok(fullpath):
-            return None
-        else:
-            return [fullpath, '-c']
-
-    def success_command(self):
-        fullpath = os.path.join(bin_dir(), 'interpformat')
-        if not binary_ok(fullpath):
-            return None
-        else:
-            return [fullpath]
-
-    def exists_solution(self, exit_code, output):
-        # Handle bytes objects by decoding them to strings
-        if isinstance(output, bytes):
-            output = output.decode('utf-8', errors='replace')
-        return output.find('== MODEL ==') >= 0
-
     def count_solutions(self, solutions):
         return solutions.count('interpretation')
 
-    def exit_message(self, code):
-        if code in self.exits.keys():
-            return self.exits[code]
-        else:
-            return 'unknown exit code: %d' % code
-
-    def logo_bitmap(self):
-        if not os.access(self.logo_path, os.R_OK):
-            error_dialog('The logo file %s cannot be found.' % self.logo_path)
-            return None
-        else:
-            return wx.Image(self.logo_path,
-                            wx.BITMAP_TYPE_GIF).ConvertToBitmap()
-
     def get_info_from_stderr(self, lines):
         line = utilities.grep_last('Domain_size=', lines)
         if line:
@@ -360,7 +349,7 @@ class Reformat_proof:
             error_dialog('grayout_options: unknown proof format')
 
     def command(self):
-        command = [os.path.join(bin_dir(), 'prooftrans'), self.choice]
+        command = [Prover9.success_path, self.choice]
         if self.expand_cb.IsEnabled() and self.expand_cb.IsChecked():
             command.append('expand')
         if self.renumber_cb.IsEnabled() and self.renumber_cb.IsChecked():
@@ -380,9 +369,24 @@ class Reformat_proof:
 
     def on_ok(self, evt):
         command = self.command()
-        (exit_code, output, err) = run_and_wait(command, input=self.proofs)
         self.dlg.Destroy()
-        if exit_code != 0:
+        # Run prooftrans in a side thread so the GUI stays responsive.
+        threading.Thread(target=self.run, args=(command,), daemon=True).start()
+
+    def run(self, command):
+        try:
+            (exit_code, output, err) = run_and_wait(command, input=self.proofs)
+        except Exception as e:
+            # e.g., the program could not be started; report it below
+            (exit_code, output) = (None, '%s: %s' % (type(e).__name__, e))
+        wx.CallAfter(self.show_output, command, exit_code, output)
+
+    def show_output(self, command, exit_code, output):
+        if not self.parent:
+            return  # the proof window was closed in the meantime
+        if exit_code is None:
+            error_dialog('Error running %s:\n\n%s' % (command[0], output))
+        elif exit_code != 0:
             error_dialog("Error reformatting proofs")
         else:
             # Decode bytes to string if necessary
@@ -423,18 +427,34 @@ class Reformat_model:
         menu = wx.Menu()
         self.map = {}
         for item in self.choices:
-            id = wx.NewId()
+            id = menu.Append(wx.ID_ANY, item).GetId()
             self.map[id] = item
-            menu.Append(id, item)
-            self.parent.Bind(wx.EVT_MENU, self.on_select, id=id)
+        # Bind on the menu, which goes away with it; binding on the
+        # parent added handlers there each time Reformat was used.
+        menu.Bind(wx.EVT_MENU, self.on_select)
         self.parent.PopupMenu(menu)
         menu.Destroy()
 
     def on_select(self, evt):
         item = self.map[evt.GetId()]
-        command = [os.path.join(bin_dir(), 'interpformat'), item]
-        (exit_code, output, err) = run_and_wait(command, input=self.models)
-        if exit_code != 0:
+        command = [Mace4.success_path, item]
+        # Run interpformat in a side thread so the GUI stays responsive.
+        threading.Thread(target=self.run, args=(command,), daemon=True).start()
+
+    def run(self, command):
+        try:
+            (exit_code, output, err) = run_and_wait(command, input=self.models)
+        except Exception as e:
+            # e.g., the program could not be started; report it below
+            (exit_code, output) = (None, '%s: %s' % (type(e).__name__, e))
+        wx.CallAfter(self.show_output, command, exit_code, output)
+
+    def show_output(self, command, exit_code, output):
+        if not self.parent:
+            return  # the model window was closed in the meantime
+        if exit_code is None:
+            error_dialog('Error running %s:\n\n%s' % (command[0], output))
+        elif exit_code != 0:
             error_dialog("Error reformatting models")
         else:
             # Decode bytes to string if necessary
@@ -460,6 +480,9 @@ class Reformat_model:
 # class Reformat_model
 
 class Run_program:
+
+    stderr_tail = 4096  # bytes of stderr scanned for statistics
+
     def __init__(self, parent, program, input):
         self.program = program
         self.parent = parent
@@ -467,20 +490,35 @@ class Run_program:
         self.saved_input = [False]
         self.saved_output = [False]
         self.saved_solution = parent.saved_solution
-        self.fin = None  # do this later in the thread
-        self.output = ''  # Collect stdout here
+        self.fin = self.fout = self.ferr = None  # do this later in the thread
         self.solution = None
+        self.num_solutions = 0
         self.exit_code = 0
+        self.error = None  # description of an unexpected failure in run()
         self.state = State.ready
+        self.stderr_size = None  # stderr size when stderr_info was made
+        self.stderr_info = None
+        self.frames = {}  # Show/Save frames for this job, by kind
 
-        # Start a thread
-        _thread.start_new_thread(self.run, ())
+        # Run in a worker thread; run() reports its own failures, so the
+        # future need not be kept.
+        job_pool.submit(self.run)
 
     def run(self):
         #
         # DO NOT DO ANY GUI STUFF IN HERE, BECAUSE THIS
         # RUNS IN A SEPARATE THREAD!!!
         #
+        # Whatever happens, the panel must hear that the job is over.
+        try:
+            self.run_program()
+        except Exception as e:
+            traceback.print_exc()
+            self.error = '%s: %s' % (type(e).__name__, e)
+            self.state = State.error
+        self.parent.invoke_later(self.parent.job_finished)
+
+    def run_program(self):
         search_command  = self.program.search_command()
         success_command = self.program.success_command()
 
@@ -503,18 +541,20 @@ class Run_program:
                     stdout=self.fout, stderr=self.ferr,
                     creationflags=win32process.CREATE_NO_WINDOW)
             else:
+                # own process group, so that signals reach all of it
                 self.process = subprocess.Popen(
                     search_command, stdin=self.fin,
-                    stdout=self.fout, stderr=self.ferr)
+                    stdout=self.fout, stderr=self.ferr,
+                    start_new_session=True)
                 
             self.state = State.running
             self.exit_code = self.process.wait()  # Wait for process to finish!
             self.state = State.done
             self.fout.seek(0)  # rewind stdout
-            self.output = self.fout.read()
+            output = self.fout.read()
 
             if (self.exit_code == 0 or
-                self.program.exists_solution(self.exit_code, self.output)):
+                self.program.exists_solution(self.exit_code, output)):
 
                 # Extract the solution from stdout
                 self.fout.seek(0)
@@ -527,26 +567,49 @@ class Run_program:
                 else:
                     self.solution = ('There was an error extracting the %s.' %
                                      self.program.solution_name)
+                if self.solution:
+                    # count here, once, rather than each time it is shown
+                    self.num_solutions = self.program.count_solutions(
+                        self.solution)
 
             # Keep files open until self is deleted.
 
-        self.parent.invoke_later(self.parent.job_finished)
+    @property
+    def output(self):
+        # Stdout stays in its temp file; read it only when it is shown.
+        if self.state != State.done or not self.fout or self.fout.closed:
+            return ''
+        self.fout.seek(0)
+        return self.fout.read().decode('utf-8', errors='replace')
 
     def pause(self):
         if self.state == State.running:
-            os.kill(self.process.pid, signal.SIGSTOP)
+            os.killpg(self.process.pid, signal.SIGSTOP)
             self.state = State.suspended
 
     def resume(self):
         if self.state == State.suspended:
-            os.kill(self.process.pid, signal.SIGCONT)
+            os.killpg(self.process.pid, signal.SIGCONT)
             self.state = State.running
 
     def get_stderr_info(self):
         if self.state in [State.running, State.suspended, State.done]:
-            self.ferr.seek(0)  # rewind
-            lines = self.ferr.readlines()
+            # The latest statistics are at the end, so read only the tail.
+            size = self.ferr.seek(0, os.SEEK_END)
+            if size == self.stderr_size:
+                return self.stderr_info  # nothing new since the last call
+            # Start one byte early, so we can tell whether the tail
+            # begins with a whole line (that byte is a newline).
+            start = max(0, size - self.stderr_tail - 1)
+            self.ferr.seek(start)
+            data = self.ferr.read()
+            if start > 0:
+                # skip the partial line (or the lone newline) before it
+                data = data[data.find(b'\n')+1:] if b'\n' in data else b''
+            # Decode once here, rather than line by line in each grep.
+            lines = data.decode('utf-8', errors='replace').splitlines(True)
             info = self.program.get_info_from_stderr(lines)
+            (self.stderr_size, self.stderr_info) = (size, info)
             return info
 
     def kill(self):
@@ -555,13 +618,12 @@ class Run_program:
             if Win32():
                 win32api.TerminateProcess(int(self.process._handle), -1)
             else:
-                os.kill(self.process.pid, signal.SIGKILL)
+                os.killpg(self.process.pid, signal.SIGKILL)
 
     def done_with_job(self):
-        if self.fin:  # if one exists, all exist
-            self.fin.close()
-            self.fout.close()
-            self.ferr.close()
+        for f in (self.fin, self.fout, self.ferr):
+            if f:
+                f.close()
         del self
 
 # end class Run_program()
@@ -678,6 +740,21 @@ class Program_panel(wx.Panel):
         self.Bind(wx.EVT_BUTTON, self.on_show_save, self.show_save_btn)
         self.show_save_btn.Enable(False)
 
+        # The Show/Save menu (items, IDs, handlers) is built and bound
+        # once; each popup only updates which items are enabled.
+        self.ss_input_id = wx.NewIdRef()
+        self.ss_output_id = wx.NewIdRef()
+        self.ss_solution_id = wx.NewIdRef()
+        self.ss_menu = wx.Menu()
+        self.ss_menu.Append(self.ss_input_id, program.name +
+                            ' Input (from most recent search)')
+        self.ss_menu.Append(self.ss_output_id, program.name + ' Output')
+        self.ss_menu.Append(self.ss_solution_id,
+                            program.name + ' ' + program.solution_name)
+        self.Bind(wx.EVT_MENU, self.ss_input, id=self.ss_input_id)
+        self.Bind(wx.EVT_MENU, self.ss_output, id=self.ss_output_id)
+        self.Bind(wx.EVT_MENU, self.ss_solution, id=self.ss_solution_id)
+
         show_sizer = wx.BoxSizer(wx.HORIZONTAL)
         show_sizer.Add(self.info_btn,   0, wx.ALL, 1)
         show_sizer.Add(self.show_save_btn, 0, wx.ALL, 1)
@@ -712,10 +789,10 @@ class Program_panel(wx.Panel):
         if self.job:
             info = self.job.get_stderr_info()
             self.info_panel.update(info)
-            if self.job.state == State.done:
+            if self.job.state == State.done and self.timer:
                 self.timer.Stop()
                 self.timer = None
-        else:
+        elif self.timer:
             self.timer.Stop()
             self.timer = None
 
@@ -745,13 +822,17 @@ class Program_panel(wx.Panel):
                 if rc == wx.ID_CANCEL:
                     return
 
-            self.job = None  # Will be handled by garbage collection
+            # Release the old job's temp files (its stdout can be large)
+            # now, rather than whenever the garbage collector gets to it.
+            self.job.done_with_job()
+            self.job = None
 
             self.info_btn.Enable(False)
             if self.info_panel:
                 self.info_panel.Close()
                 self.info_panel = None  # Clear the reference
 
+        self.Freeze()  # redraw the panel once, after all of the changes
         self.start_btn.Enable(False)
         self.time_ctrl.Enable(False)
         self.pause_btn.Enable(True)
@@ -760,6 +841,7 @@ class Program_panel(wx.Panel):
         self.show_save_btn.Enable(False)
         self.bar.start()
         self.state_text.SetLabel('Running')
+        self.Thaw()
         input = to_top(self).setup.assemble_input()
         input = 'assign(report_stderr, 2).\n' + input
         self.job = Run_program(self, self.program, input)
@@ -798,6 +880,7 @@ class Program_panel(wx.Panel):
             return None
 
     def job_finished(self):
+        self.Freeze()  # redraw the panel once, after all of the changes
         self.bar.stop()
         self.pause_btn.Enable(False)
         self.pause_btn.SetLabel('Pause')
@@ -806,14 +889,25 @@ class Program_panel(wx.Panel):
         self.start_btn.Enable(True)
         self.time_ctrl.Enable(True)
 
+        if self.info_panel and self.job.state == State.done:
+            # Show the final statistics now, instead of waiting for
+            # the next tick of the info timer.
+            self.update_info(None)
+
         if self.job.state == State.error:
-            self.state_text.SetLabel('Program_Not_Found')
-            error_dialog('%s binaries not found, looking in\n%s' %
-                         (self.program.name, bin_dir()))
+            message = 'Error' if self.job.error else 'Program_Not_Found'
         else:
             message = self.program.exit_message(self.job.exit_code)
-            self.state_text.SetLabel(message)
+        self.state_text.SetLabel(message)
+        self.Thaw()
 
+        if self.job.state == State.error and self.job.error:
+            error_dialog('%s could not be run:\n\n%s' %
+                         (self.program.name, self.job.error))
+        elif self.job.state == State.error:
+            error_dialog('%s binaries not found, looking in\n%s' %
+                         (self.program.name, bin_dir()))
+        else:
             if self.job.exit_code == 1:  # fatal error
                 frame = Text_frame(
                     self, to_top(self).box_font,
@@ -832,50 +926,53 @@ class Program_panel(wx.Panel):
                     info_dialog('%s Exit: %s. \n%s'
                                 % (self.program.name, message,
                                    self.program.some_message))
-            elif self.program.exits[self.job.exit_code] != 'Killed':
+            elif message != 'Killed':
                 info_dialog('%s Exit: %s' % (self.program.name, message))
 
     def on_show_save(self, evt):
-        menu = wx.Menu()
-
-        id = wx.NewId()
-        menu.Append(id, self.program.name + ' Input (from most recent search)')
-        self.Bind(wx.EVT_MENU, self.ss_input, id=id)
-
-        id = wx.NewId()
-        menu.Append(id, self.program.name + ' Output')
-        self.Bind(wx.EVT_MENU, self.ss_output, id=id)
-        if self.job.state == State.error:
-            menu.Enable(id, False)
-
-        id = wx.NewId()
-        menu.Append(id, self.program.name + ' ' + self.program.solution_name)
-        self.Bind(wx.EVT_MENU, self.ss_solution, id=id)
-        if self.job.exit_code != 0 and not self.job.solution:
-            menu.Enable(id, False)
-
+        menu = self.ss_menu
+        menu.Enable(self.ss_output_id, self.job.state != State.error)
+        # Only when there is something to show: exit code 0 with no
+        # extracted solution (e.g., clear(print_proofs)) has nothing.
+        menu.Enable(self.ss_solution_id, bool(self.job.solution))
         self.PopupMenu(menu)
-        menu.Destroy()
+
+    def raise_frame(self, kind):
+        # If this job's frame of this kind is still open, bring it to the
+        # front instead of building another copy of the (large) text.
+        frame = self.job.frames.get(kind)
+        if frame:  # false after the frame has been destroyed
+            frame.Raise()
+            return True
+        return False
 
     def ss_input(self, evt):
+        if self.raise_frame('input'):
+            return
         frame = Text_frame(self, to_top(self).box_font,
                            self.program.name + ' Input',
                            self.job.input,
                            extension='in', saveas=True,
                            saved_flag=self.job.saved_input)
+        self.job.frames['input'] = frame
         frame.Show(True)
         
     def ss_output(self, evt):
+        if self.raise_frame('output'):
+            return
         frame = Text_frame(self, to_top(self).box_font,
                            self.program.name + ' Output',
                            self.job.output,
                            extension='out', saveas=True,
                            saved_flag=self.job.saved_output)
+        self.job.frames['output'] = frame
         frame.Show(True)
         
     def ss_solution(self, evt):
+        if self.raise_frame('solution'):
+            return
         extra_ops=[('Reformat ...', self.on_reformat)]
-        solutions = self.program.count_solutions(self.job.solution)
+        solutions = self.job.num_solutions
         if (self.program.name == 'Mace4' and solutions > 1):
             extra_ops.append(('Isofilter...', self.on_isofilter))
         if solutions == 1:
@@ -893,6 +990,7 @@ class Program_panel(wx.Panel):
             saveas=True,
             saved_flag=self.job.saved_solution,
             extra_operations=extra_ops)
+        self.job.frames['solution'] = frame
         frame.Show(True)
 
     def on_reformat(self, evt):
@@ -964,7 +1062,13 @@ class Isofilter_frame(wx.Frame):
 
         self.parent = parent
         self.models = models
-        self.state = State.ready  # We'll use ready and running
+        self.state = State.ready  # ready, running, done, or error
+        self.process = None
+        self.fin = self.fout = self.ferr = None
+        self.error = None  # description of an unexpected failure in run()
+        self.exit_code = None
+        self.cancelled = False  # killed before the program was started
+        self.lock = threading.Lock()  # between starting and killing
         
         wx.Frame.__init__(self, parent, title='Isofilter',
                           pos=pos_for_center((0,0)))
@@ -974,24 +1078,19 @@ class Isofilter_frame(wx.Frame):
         ops_string = ' '.join(ops_in_interp(models))
 
         check_lab  = wx.StaticText(self, -1, 'Check:')
-        self.check_id = wx.NewId()
-        self.check_ctrl = wx.TextCtrl(self, self.check_id,
+        self.check_ctrl = wx.TextCtrl(self, -1,
                                       value=ops_string, size=(200,-1))
 
         out_lab  = wx.StaticText(self, -1, 'Output:')
-        self.out_id = wx.NewId()
-        self.out_ctrl = wx.TextCtrl(self, self.out_id,
+        self.out_ctrl = wx.TextCtrl(self, -1,
                                     value=ops_string, size=(200,-1))
 
-        self.ignore_id = wx.NewId()
-        self.ignore_cb = wx.CheckBox(self, self.ignore_id, 'Ignore Constants')
+        self.ignore_cb = wx.CheckBox(self, -1, 'Ignore Constants')
 
-        self.wrap_id = wx.NewId()
-        self.wrap_cb = wx.CheckBox(self, self.wrap_id, 'Enclose in List')
+        self.wrap_cb = wx.CheckBox(self, -1, 'Enclose in List')
 
         alg_lab =  wx.StaticText(self, -1, 'Algorithm:')
-        self.alg_id = wx.NewId()
-        self.alg_ch = wx.Choice(self, self.alg_id,
+        self.alg_ch = wx.Choice(self, -1,
                                 choices=['Occurrence Profiles',
                                          'Canonical Forms'])
         self.alg_ch.SetSelection(0)
@@ -1063,14 +1162,33 @@ class Isofilter_frame(wx.Frame):
             self.command = command
             self.start_btn.Disable()
             self.bar.start()
-            _thread.start_new_thread(self.run, ())
+            running_isofilters.add(self)
+            # A daemon thread of its own: never queued behind other jobs,
+            # and it doesn't hold up quitting.
+            threading.Thread(target=self.run, daemon=True).start()
 
     def run(self):
         #
         # DO NOT DO ANY GUI STUFF IN HERE, BECAUSE THIS
         # RUNS IN A SEPARATE THREAD!!!
         #
+        # Whatever happens, the frame must hear that the job is over.
+        try:
+            self.run_program()
+            self.state = State.done
+        except Exception as e:
+            traceback.print_exc()
+            self.error = '%s: %s' % (type(e).__name__, e)
+            self.state = State.error
+
+        if self:
+            self.invoke_later(self.job_finished)
+        else:
+            # The frame was closed (title bar) while isofilter ran.
+            running_isofilters.discard(self)
+            self.close_files()
 
+    def run_program(self):
         self.fin  = tempfile.TemporaryFile('w+b')  # stdin
         self.fout = tempfile.TemporaryFile('w+b')  # stdout
         self.ferr = tempfile.TemporaryFile('w+b')  # stderr
@@ -1081,27 +1199,40 @@ class Isofilter_frame(wx.Frame):
         self.fin.write(self.models)
         self.fin.seek(0)
 
-        if Win32():
-            # creationflag says not to pop a DOS box
-            self.process = subprocess.Popen(
-                self.command, stdin=self.fin,
-                stdout=self.fout, stderr=self.ferr,
-                creationflags=win32process.CREATE_NO_WINDOW)
-        else:
-            self.process = subprocess.Popen(
-                self.command, stdin=self.fin,
-                stdout=self.fout, stderr=self.ferr)
+        with self.lock:  # so that kill() sees either no process or a process
+            if self.cancelled:
+                return
+            if Win32():
+                # creationflag says not to pop a DOS box
+                self.process = subprocess.Popen(
+                    self.command, stdin=self.fin,
+                    stdout=self.fout, stderr=self.ferr,
+                    creationflags=win32process.CREATE_NO_WINDOW)
+            else:
+                # own process group, so that signals reach all of it
+                self.process = subprocess.Popen(
+                    self.command, stdin=self.fin,
+                    stdout=self.fout, stderr=self.ferr,
+                    start_new_session=True)
+            self.state = State.running
 
-        self.state = State.running
         self.exit_code = self.process.wait()  # Wait for process to finish!
         self.fout.seek(0)  # rewind stdout
         self.filtered_models = self.fout.read()
 
-        self.invoke_later(self.job_finished)
+    def close_files(self):
+        for f in (self.fin, self.fout, self.ferr):
+            if f:
+                f.close()
 
     def job_finished(self):
+        running_isofilters.discard(self)
         self.bar.stop()
-        if self.exit_code == 1:
+        if self.state == State.error:
+            error_dialog('Isofilter could not be run:\n\n' + self.error)
+        elif self.cancelled:
+            pass
+        elif self.exit_code == 1:
             self.ferr.seek(0)  # rewind stderr
             err = self.ferr.read()
             if isinstance(err, bytes):
@@ -1139,23 +1270,51 @@ class Isofilter_frame(wx.Frame):
                              'giving %d nonisomorphic model(s).') %
                             (input, input-kept, kept))
 
-        self.fin.close()
-        self.fout.close()
-        self.ferr.close()
+        self.close_files()
         self.Close()
         
+    def kill(self):
+        # Cleanup will occur when the 'run' thread terminates.
+        with self.lock:
+            if not self.process:
+                self.cancelled = True  # run() won't start the program
+            elif self.process.poll() is None:  # still running
+                # It can still exit before the signal gets there.
+                if Win32():
+                    try:
+                        win32api.TerminateProcess(
+                            int(self.process._handle), -1)
+                    except win32api.error:
+                        pass
+                else:
+                    try:
+                        os.killpg(self.process.pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+
     def on_cancel(self, evt):
-        if self.state == State.running:
-            # Cleanup will occur when the 'run' thread terminates.
-            if Win32():
-                win32api.TerminateProcess(int(self.process._handle), -1)
-            else:
-                os.kill(self.process.pid, signal.SIGKILL)
+        if self in running_isofilters:
+            self.kill()
         else:
             self.Close()
     
 # END class Isofilter_frame(wx.Frame)
 
+# Isofilter frames whose program has been started and not yet finished.
+
+running_isofilters = set()
+
+def kill_isofilters():
+    "Kill all running isofilter programs (e.g., when quitting)."
+    for frame in list(running_isofilters):
+        frame.kill()
+
+# Compile regular expressions for extracting syntax errors.
+
+r_error_message = re.compile('(?<=%%ERROR: ).*')
+r_error_text = re.compile('(?<=%%START ERROR%%).*(?=%%END ERROR%%)',
+                          re.DOTALL)  # allow to cross lines
+
 def syntax_check(input):
 
     prover9_command  = Prover9().search_command()
@@ -1180,13 +1339,10 @@ def syntax_check(input):
             if isinstance(output, bytes):
                 output = output.decode('utf-8', errors='replace')
                 
-            if re.search('%%ERROR', output):
-                r = re.compile('(?<=%%ERROR: ).*')
-                m = r.search(output)
+            if '%%ERROR' in output:
+                m = r_error_message.search(output)
                 message = output[m.start():m.end()-1] + '.'
-                r = re.compile('(?<=%%START ERROR%%).*(?=%%END ERROR%%)',
-                               re.DOTALL)  # allow to cross lines
-                m = r.search(output)
+                m = r_error_text.search(output)
                 if m:
                     error = output[m.start():m.end()].strip()
                 else:
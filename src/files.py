@@ -20,6 +20,7 @@
 # system imports
 
 import os, sys
+import functools
 import importlib.util
 import importlib.machinery
 
@@ -41,6 +42,7 @@ def path_info():
             ))
     return info
 
+@functools.cache
 def program_dir():
     """
     This gets the full pathname of the directory containing the program.
@@ -53,6 +55,7 @@ def program_dir():
         return sys.path[0]
         # return os.path.dirname(os.path.abspath(sys.argv[0]))
 
+@functools.cache
 def bin():
     if Win32():
         return 'bin-win32'
@@ -64,20 +67,33 @@ def bin():
     else:
         return 'bin'
 
+@functools.cache
 def bin_dir():
     return os.path.join(program_dir(), bin())
 
+@functools.cache
 def image_dir():
     return os.path.join(program_dir(), 'Images')
 
+@functools.cache
 def sample_dir():
     return os.path.join(program_dir(), 'Samples')
 
+# Binaries that have been found.  Only successes are remembered, so a
+# missing binary is noticed as soon as it is installed.
+
+binaries_found = set()
+
 def binary_ok(fullpath):
     if not fullpath:
         return False
+    elif fullpath in binaries_found:
+        return True
     elif Win32():
-        return os.access(fullpath + '.exe', os.X_OK)
+        ok = os.access(fullpath + '.exe', os.X_OK)
     else:
-        return os.access(fullpath, os.X_OK)
+        ok = os.access(fullpath, os.X_OK)
+    if ok:
+        binaries_found.add(fullpath)
+    return ok
 
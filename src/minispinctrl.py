@@ -238,6 +238,10 @@ class SpinEvent(wx.PyCommandEvent):
 
 class MiniSpinCtrl(wx.Control):
 
+    # Decoded and scaled arrow images, shared by all controls of the same
+    # height: (height) -> (up, down, updown, disabled)
+    _images = {}
+
     def __init__(self, parent, id=wx.ID_ANY, pos=wx.DefaultPosition, size=wx.DefaultSize, min=0, max=100, initial=0, style=wx.TE_RIGHT, name="MiniSpinCtrl"):
         """
         Default class constructor.
@@ -315,10 +319,17 @@ class MiniSpinCtrl(wx.Control):
         self.spinner.SetBackgroundColour(self.GetBackgroundColour())
 
     def InitialiseBitmaps(self):
-        self._imgup = self.SetImageSize(getspinupImage())
-        self._imgdown = self.SetImageSize(getspindownImage())
-        self._imgupdown = self.SetImageSize(getspinupdownImage())
-        self._imgdisabled = self.SetImageSize(getspindisabledImage())
+        h = self.GetSize()[1]
+        images = MiniSpinCtrl._images.get(h)
+        if images is None:
+            # Decode the embedded PNGs only for the first control of this height
+            images = (self.SetImageSize(getspinupImage()),
+                      self.SetImageSize(getspindownImage()),
+                      self.SetImageSize(getspinupdownImage()),
+                      self.SetImageSize(getspindisabledImage()))
+            MiniSpinCtrl._images[h] = images
+        (self._imgup, self._imgdown,
+         self._imgupdown, self._imgdisabled) = images
         if self._initial <= self._min:
             self._img = self._imgup
         elif self._initial >= self._max:
@@ -56,7 +56,19 @@ Comment_m4_add  = '% Additional input for Mace4'
 
 All_added_comments = [Comment_banner, Comment_opt_dep, Comment_lang,
                       Comment_p9_opt, Comment_m4_opt,
-                      Comment_p9_add, Comment_p9_add]
+                      Comment_p9_add, Comment_m4_add]
+
+# One regular expression for all of them, compiled once.
+
+r_added_comments = re.compile('|'.join(All_added_comments))
+
+# Attributes (#...) highlighted in the input.
+
+r_attribute = re.compile('#[^.\n]*[.\n]')
+
+# set(ignore_option_dependencies), which is taken out of opened input.
+
+r_ignore_dep = re.compile(r'set\s*\(\s*ignore_option_dependencies\s*\)\s*\.')
 
 class Input_panel(wx.Panel):
 
@@ -117,9 +129,13 @@ class Input_panel(wx.Panel):
         if self.timer:
             error_dialog('start_auto_highlight: timer alreay exists')
         else:
+            # One-shot timer, restarted by each change to the text, so the
+            # box is highlighted once typing pauses, and idle boxes cost
+            # nothing.
             self.timer = wx.Timer(self, -1)
             self.Bind(wx.EVT_TIMER, self.check_highlight, self.timer)
-            self.timer.Start(2000)  # check every 2 seconds
+            if self.have_new_text:
+                self.timer.StartOnce(2000)
             self.hilite_btn.Show(False)
         
     def stop_auto_highlight(self):
@@ -184,44 +200,52 @@ class Input_panel(wx.Panel):
 
     def highlight(self):
         str = self.ed.GetValue()
+        box_font = to_top(self).box_font
+        # Freeze so the reset and the restyling are drawn once, not
+        # once per SetStyle call.
+        self.ed.Freeze()
         # reset to all black text
         self.ed.SetStyle(0, self.ed.GetLastPosition(),
-                         wx.TextAttr('BLACK', 'WHITE', to_top(self).box_font))
+                         wx.TextAttr('BLACK', 'WHITE', box_font))
 
         # attributes:
-        spans = utilities.pattern_spans('#[^.\n]*[.\n]', str)
+        attr = wx.TextAttr(wx.Colour(0,0,200))  # one TextAttr for all spans
+        spans = utilities.pattern_spans(r_attribute, str)
         for (start,end) in spans:
-            self.ed.SetStyle(start, end, wx.TextAttr(wx.Colour(0,0,200)))
+            self.ed.SetStyle(start, end, attr)
 
         font = self.ed.GetFont()
         font.SetStyle(wx.FONTSTYLE_ITALIC)
 
         # comments (line and block)
+        attr = wx.TextAttr(wx.Colour(0,160,0), font=font)
         spans = utilities.comment_spans(str)
         for (start,end) in spans:
-            self.ed.SetStyle(start, end, wx.TextAttr(wx.Colour(0,160,0),
-                                                     font=font))
+            self.ed.SetStyle(start, end, attr)
 
         # following needed on mac to undo italics (???)
-        self.ed.SetDefaultStyle(wx.TextAttr('BLACK','WHITE',
-                                            to_top(self).box_font))
+        self.ed.SetDefaultStyle(wx.TextAttr('BLACK','WHITE', box_font))
+        self.ed.Thaw()
+        self.have_new_text = False  # all of the current text is done
         
+    def new_text(self):
+        self.have_new_text = True
+        if self.timer:
+            self.timer.StartOnce(2000)  # (re)start the 2 second countdown
+
     def on_text(self, evt):
         # This gets called whenever the text is changed (EVT_TEXT)
-        self.have_new_text = True
+        self.new_text()
 
     def on_char(self, evt):
         # This gets called whenever a character is inserted (EVT_CHAR)
-        self.have_new_text = True
+        self.new_text()
         evt.Skip() # allows normal processing of char
 
     def check_highlight(self, evt):
-        # This gets called periodically.
+        # This gets called 2 seconds after the last change.
         if self.have_new_text:
-            self.have_new_text = False
-            self.timer.Stop()
             self.highlight()
-            self.timer.Start(2000)
 
 # END class Input_panel(Panel)
 
@@ -394,11 +418,13 @@ class Setup_tabs(wx.Notebook):
 
         # Formulas Tab
 
+        auto_highlight = to_top(self).auto_highlight()  # same for all boxes
+
         self.formulas = wx.SplitterWindow(self, -1)
         self.assumps = Input_panel(self.formulas, 'Assumptions',
-                                 to_top(self).auto_highlight())
+                                   auto_highlight)
         self.goals   = Input_panel(self.formulas, 'Goals',
-                                 to_top(self).auto_highlight())
+                                   auto_highlight)
 
         self.formulas.SplitHorizontally(self.assumps, self.goals)
         self.formulas.SetSashGravity(0.75)
@@ -424,9 +450,9 @@ class Setup_tabs(wx.Notebook):
 
         self.add = wx.SplitterWindow(self, -1)
         self.add_p9 = Input_panel(self.add, 'Additional Input for Prover9',
-                                 to_top(self).auto_highlight())
+                                  auto_highlight)
         self.add_m4 = Input_panel(self.add, 'Additional Input for Mace4',
-                                 to_top(self).auto_highlight())
+                                  auto_highlight)
         self.add.SplitHorizontally(self.add_p9, self.add_m4)
                                    
         self.add.SetSashGravity(0.75)
@@ -485,26 +511,33 @@ class Setup_tabs(wx.Notebook):
         p9_opt = option_triples_to_string(p9_triples)
         m4_opt = option_triples_to_string(m4_triples)
 
-        input = 'set(ignore_option_dependencies). %s\n\n' % Comment_opt_dep
+        # Collect the pieces and join them once at the end.
+        parts = ['set(ignore_option_dependencies). %s\n\n' % Comment_opt_dep]
         if language.strip() != '':
-            input += '%s\n\n%s\n' % (Comment_lang,language)
+            parts.append('%s\n\n%s\n' % (Comment_lang,language))
         if p9_opt.strip() != '':
-            input += 'if(Prover9). %s\n%send_if.\n\n' % (Comment_p9_opt,p9_opt)
+            parts.append('if(Prover9). %s\n%send_if.\n\n' %
+                         (Comment_p9_opt,p9_opt))
         if m4_opt.strip() != '':
-            input += 'if(Mace4).   %s\n%send_if.\n\n' % (Comment_m4_opt,m4_opt)
+            parts.append('if(Mace4).   %s\n%send_if.\n\n' %
+                         (Comment_m4_opt,m4_opt))
         if p9_add.strip() != '':
-            input += 'if(Prover9). %s\n%send_if.\n\n' % (Comment_p9_add,p9_add)
+            parts.append('if(Prover9). %s\n%send_if.\n\n' %
+                         (Comment_p9_add,p9_add))
         if m4_add.strip() != '':
-            input += 'if(Mace4).   %s\n%send_if.\n\n' % (Comment_m4_add,m4_add)
+            parts.append('if(Mace4).   %s\n%send_if.\n\n' %
+                         (Comment_m4_add,m4_add))
 
-        input += '\nformulas(assumptions).\n\n%s\nend_of_list.\n\n' % assumps
-        input += '\nformulas(goals).\n\n%s\nend_of_list.\n\n' % goals
+        parts.append('\nformulas(assumptions).\n\n%s\nend_of_list.\n\n' %
+                     assumps)
+        parts.append('\nformulas(goals).\n\n%s\nend_of_list.\n\n' % goals)
+        input = ''.join(parts)
         input = re.sub(r'\n\s*\n', '\n\n', input)  # collapse blank lines
         return input
 
     def store_input(self, input):
 
-        input = utilities.remove_reg_exprs(All_added_comments, input)
+        input = r_added_comments.sub('', input)
 
         (p9,m4,assumps,goals,opt,lang,other) = partition_input.partition(input)
 
@@ -517,49 +550,53 @@ class Setup_tabs(wx.Notebook):
         # and tell set_options() to ignore dependencies while putting the
         # options into the GUI.
 
-        r = re.compile(r'set\s*\(\s*ignore_option_dependencies\s*\)\s*\.')
-        if r.match(opt):
-            opt = r.sub('', opt)
+        if r_ignore_dep.match(opt):
+            opt = r_ignore_dep.sub('', opt)
             handle_dep = False
         else:
             handle_dep = True
 
+        # Freeze, so the option panels and the text boxes are redrawn once,
+        # after everything is stored.  Dialogs wait until after the Thaw.
+        self.Freeze()
+
         p9_opt_x = set_options(p9_opt, self.p9_options.panels,
                                handle_dep = handle_dep)
+        m4_opt_x = set_options(m4_opt, self.m4_options, handle_dep=handle_dep)
+        opt_x = set_options_either(opt, self.p9_options.panels,
+                                   self.m4_options, handle_dep = handle_dep)
+
+        self.language.input.ed.AppendText(lang.replace('.', '.\n'))
+        self.assumps.ed.AppendText(assumps)
+        self.goals.ed.AppendText(goals)
+        self.add_p9.ed.AppendText(p9_opt_x + p9_other + opt_x + other)
+        self.add_m4.ed.AppendText(m4_opt_x + m4_other)
+
+        for box in self.text_boxes:
+            box.highlight()
+            box.ed.ShowPosition(0)
+
+        self.SetSelection(1)  # Start with second page (Formulas) showing
+        self.Thaw()
+
         if p9_opt_x != '':
             info_dialog('The following options from the if(Prover9) section'
                         ' of the input were not recognized.  They have been'
                         ' added to the "Additional Input for Prover9" box.\n\n'
                         + p9_opt_x)
 
-        m4_opt_x = set_options(m4_opt, self.m4_options, handle_dep=handle_dep)
         if m4_opt_x != '':
             info_dialog('The following options from the if(Mace4) section'
                         ' of the input were not recognized.  They have been'
                         ' added to the "Additional Input for Mace4" box.\n\n'
                         + m4_opt_x)
 
-        opt_x = set_options_either(opt, self.p9_options.panels,
-                                   self.m4_options, handle_dep = handle_dep)
-
         if opt_x != '':
             info_dialog('The following options from the '
                         ' input file were not recognized.  They have been'
                         ' added to the "Additional Input for Prover9" box.\n\n'
                         + opt_x)
 
-        self.language.input.ed.AppendText(lang.replace('.', '.\n'))
-        self.assumps.ed.AppendText(assumps)
-        self.goals.ed.AppendText(goals)
-        self.add_p9.ed.AppendText(p9_opt_x + p9_other + opt_x + other)
-        self.add_m4.ed.AppendText(m4_opt_x + m4_other)
-
-        for box in self.text_boxes:
-            box.highlight()
-            box.ed.ShowPosition(0)
-
-        self.SetSelection(1)  # Start with second page (Formulas) showing
-
     def store_new_input(self, input, version):
         self.reset()  # clears everything in setup tabs
 
@@ -19,7 +19,7 @@
 
 # system imports
 
-import os, sys, types
+import os, sys
 import re
 import wx
 import copy
@@ -40,6 +40,8 @@ Parm        = 1  # integer value
 Stringparm  = 2  # string value
 Group       = 3  # special case for layout only
 
+Value_types = frozenset([Flag, Parm, Stringparm])  # records that hold values
+
 # Indexes into option records (Flag, Parm, Stringparm, unless noted otherwise):
 
 Id       = 0
@@ -68,30 +70,29 @@ class MyWindowIDRef(wx.WindowIDRef):
 def id_to_option(id, options):
     "Given an option id, return the record."
     for opt in options:
-        if opt[Type] in [Flag, Parm, Stringparm] and opt[Id] == id:
+        if opt[Type] in Value_types and opt[Id] == id:
             return opt
     return None
 
-def name_to_option(name, options):
-    "Given an option name, return the record."
+def index_options_by_name(options, index):
+    """Add the option records to a dictionary indexed by name.  If a
+    name occurs more than once, the first record is kept."""
     for opt in options:
-        if opt[Type] in [Flag, Parm, Stringparm] and opt[Name] == name:
-            # if isinstance(opt[Id], wx.WindowIDRef):
-            #     opt[Id] = MyWindowIDRef(opt[Id].GetValue())
-            # if isinstance(opt[Label_id], wx.WindowIDRef):
-            #     opt[Label_id] = MyWindowIDRef(opt[Label_id].GetValue())
-            return opt
-    return None
+        if opt[Type] in Value_types:
+            index.setdefault(opt[Name], opt)
+    return index
 
 def nondefault_options(options, work):
     """Collect the options with nondefault values.  A list of triples
     is returned: (type, name, value).  We pass in a partially constructed
     list so that we can prevent duplicates."""
+    seen = set(work)
     for opt in options:
-        if (opt[Type] in [Flag, Parm, Stringparm] and
+        if (opt[Type] in Value_types and
             opt[Value] != opt[Default]):
             triple = (opt[Type], opt[Name], opt[Value])
-            if not utilities.member(triple, work):
+            if triple not in seen:
+                seen.add(triple)
                 work.append(triple)
     return work
 
@@ -103,24 +104,18 @@ def option_triples_contains_name(triples, name):
 
 def option_triples_to_string(triples):
     "Return a string that can be given to a LADR program (e.g., Prover9)."
-    s = ''
+    lines = []
     for (type,name,value) in triples:
         if type == Flag:
             if value:
-                s += f'  set({name}).\n'
+                lines.append(f'  set({name}).\n')
             else:
-                s += f'  clear({name}).\n'
+                lines.append(f'  clear({name}).\n')
         elif type == Parm:
-            s += f'  assign({name}, {value}).\n'
+            lines.append(f'  assign({name}, {value}).\n')
         elif type == Stringparm:
-            s += f'  assign({name}, {value}).\n'
-    return s
-
-def print_sharing(opt):
-    "For debugging."
-    print(f'  option: {opt[Id]} {opt[Name]} {str(opt[Value])}')
-    for o in opt[Share]:
-        print(f'        {o[Id]} {o[Name]}')
+            lines.append(f'  assign({name}, {value}).\n')
+    return ''.join(lines)
 
 def update_label(opt):
     "Given an option, set the color of its label."
@@ -160,11 +155,11 @@ def update_dependent(opt):
             v1 == 'any' or
             (v1 == '>=0' and opt[Value] >= 0) or
             (v1 == '>0' and opt[Value] > 0)):
-            if type(v2) == types.TupleType:
+            if isinstance(v2, tuple):
                 (op, x) = v2
                 if op == 'multiply':
                     update_option(dep_opt, opt[Value] * x)
-                elif opt == 'add':
+                elif op == 'add':
                     update_option(dep_opt, opt[Value] + x)
             else:
                 update_option(dep_opt, v2)
@@ -216,7 +211,7 @@ class Options_panel(wx.Panel):
         groups = []
 
         for opt in self.options:
-            if opt[Type] in [Flag, Parm, Stringparm]:
+            if opt[Type] in Value_types:
 
                 if groups == []:
                     # in case the options are not divided into groups
@@ -319,7 +314,7 @@ class Options_panel(wx.Panel):
 
     def on_reset(self, evt):
         for opt in self.options:
-            if (opt[Type] in [Flag, Parm, Stringparm] and
+            if (opt[Type] in Value_types and
                 opt[Value] != opt[Default]):
 
                 update_option(opt, opt[Default])
@@ -395,6 +390,7 @@ class M4_options:
         self.panel = wx.Panel(parent)
         self.options_panel = Options_panel(self.panel, 'Mace4 Options',
                                  logo_bitmap, self.options)
+        self.name_index = index_options_by_name(self.options, {})
         # mark dependencies
         for ((n1,v1),(n2,v2)) in self.dependencies:
             o1 = self.name_to_opt(n1)
@@ -425,7 +421,7 @@ class M4_options:
         return triples
 
     def name_to_opt(self, name):
-        return name_to_option(name, self.options)
+        return self.name_index.get(name)
 
     def share_external_option(self, external_opt):
         local_opt = self.name_to_opt(external_opt[Name])
@@ -433,8 +429,6 @@ class M4_options:
             error_dialog('share_external_option(M4), not found')
         else:
             link_options(local_opt, external_opt)
-            # print 'External(M4):'; print_sharing(local_opt)
-            # print '             '; print_sharing(external_opt)
 
     def reset(self):
         self.options_panel.on_reset(None)
@@ -807,19 +801,22 @@ class P9_options:
             panels[name] = Options_panel(parent, name, None, options)
             panels[name].Show(False)  # start out hidden
 
-        # find and mark the shared options
-        for (_,options1) in self.option_sets:
-            for opt1 in options1:
-                if opt1[Type] in [Flag, Parm, Stringparm]:
-                    for (_,options2) in self.option_sets:
-                        for opt2 in options2:
-                            if (opt1[Type] == opt2[Type] and
-                                opt1[Name] == opt2[Name] and
-                                not opt1 in opt2[Share]):
+        # index the options by name (first occurrence wins)
+        self.name_index = {}
+        for (_,options) in self.option_sets:
+            index_options_by_name(options, self.name_index)
 
-                                link_options(opt1, opt2)
-                                # print 'Share:'; print_sharing(opt1)
-                                # print '      '; print_sharing(opt2)
+        # find and mark the shared options: link each option to the
+        # first option with the same type and name
+        first = {}
+        for (_,options) in self.option_sets:
+            for opt in options:
+                if opt[Type] in Value_types:
+                    key = (opt[Type], opt[Name])
+                    if key in first:
+                        link_options(first[key], opt)
+                    else:
+                        first[key] = opt
 
         # mark dependencies
         for ((n1,v1),(n2,v2)) in self.dependencies:
@@ -856,11 +853,7 @@ class P9_options:
         return triples
 
     def name_to_opt(self, name):
-        for (_,options) in self.option_sets:
-            opt = name_to_option(name, options)
-            if opt:
-                return opt
-        return None
+        return self.name_index.get(name)
 
     def share_external_option(self, external_opt):
         local_opt = self.name_to_opt(external_opt[Name])
@@ -868,8 +861,6 @@ class P9_options:
             error_dialog('share_external_option(P4), not found')
         else:
             link_options(local_opt, external_opt)
-            # print 'External(P9):'; print_sharing(local_opt)
-            # print '             '; print_sharing(external_opt)
 
     def reset(self):
         for key in self.panels.keys():
@@ -877,15 +868,14 @@ class P9_options:
 
 # end class P9_options
 
-def set_options(opt_str, opt_class, handle_dep = True):
+# Compile regular expressions for recognizing option commands.
 
-    not_handled = ''
+r_flag = re.compile(r'(set|clear)\s*\(\s*([a-z0-9_]+)\s*\)')  # without period
+r_parm = re.compile(r'assign\s*\(\s*([a-z0-9_]+)\s*,\s*([a-z0-9_-]+)\s*\)')  # without period
 
-    pat_flag = r'(set|clear)\s*\(\s*([a-z0-9_]+)\s*\)'  # without period
-    r_flag = re.compile(pat_flag)
+def set_options(opt_str, opt_class, handle_dep = True):
 
-    pat_parm = r'assign\s*\(\s*([a-z0-9_]+)\s*,\s*([a-z0-9_-]+)\s*\)'  # without period
-    r_parm = re.compile(pat_parm)
+    not_handled = ''
 
     opts = opt_str.split('.')[:-1]  # no option after last period
     for command in opts:
@@ -20,14 +20,28 @@
 #!/usr/bin/python
 
 import re, sys
+import bisect
+import functools
 
 import utilities
 
+# Patterns used by partition() and extract_options(), compiled once.
+
+r_if_prover9   = re.compile(r'if\s*\(\s*Prover9\s*\)\s*\.')
+r_if_mace4     = re.compile(r'if\s*\(\s*Mace4\s*\)\s*\.')
+r_end_if       = re.compile(r'end_if\s*\.')
+r_assumptions  = re.compile(r'formulas\s*\(\s*(assumptions|sos)\s*\)\s*\.')
+r_goals        = re.compile(r'formulas\s*\(\s*goals\s*\)\s*\.')
+r_end_of_list  = re.compile(r'end_of_list\s*\.')
+r_options      = re.compile(r'((set|clear)\s*\(\s*[a-z0-9_]+\s*\)\s*\.|assign\s*\(\s*[a-z0-9_]+\s*,\s*[a-z0-9_-]+\s*\)\s*\.)')
+r_language     = re.compile(r'(op\s*\([^,()]+,[^,()]+,[^,()]+\)\s*\.|redeclare\s*\([^,()]+,[^,()]+\)\s*\.)')
+r_options_only = re.compile(r'((set|clear)\s*\(\s*[a-z0-9_]+\s*\)\s*\.|assign\s*\(\s*[a-z0-9_-]+\s*,\s*[a-z0-9_]+\s*\)\s*\.)')
+
 def in_span(i, spans):
-    for (start,end) in spans:
-        if i >= start and i < end:
-            return True
-    return False
+    # spans (from comment_spans) are sorted and disjoint, so only the
+    # last one starting at or before i can contain i.
+    k = bisect.bisect_right(spans, (i, sys.maxsize)) - 1
+    return k >= 0 and i < spans[k][1]
 
 def norm(s):
     x = s.strip()  # remove leading and trailing whitespace
@@ -39,23 +53,25 @@ def norm(s):
 def split1(str, pat):
     r = re.compile(pat)
     comments = utilities.comment_spans(str)  # starts and ends of comments
-    matched = other = ''  # matched and not_matched parts
+    matched = []  # matched and not_matched parts, joined at the end
+    other = []
     other_start = 0
     m = r.search(str, 0)
     while m:
         if not in_span(m.start(), comments):
-            other   += str[other_start:m.start()]
-            matched += str[m.start():m.end()]
+            other.append(str[other_start:m.start()])
+            matched.append(str[m.start():m.end()])
             other_start = m.end()
         m = r.search(str, m.end())
-    other += str[other_start:]
-    return (matched, other)
+    other.append(str[other_start:])
+    return (''.join(matched), ''.join(other))
 
 def split2(str, start_pat, end_pat, remove_patterns=False):
     r1 = re.compile(start_pat)
     r2 = re.compile(end_pat)
     comments = utilities.comment_spans(str)  # starts and ends of comments
-    matched = other = ''
+    matched = []
+    other = []
     other_start = 0
     m1 = r1.search(str, 0)
     while m1:
@@ -64,58 +80,57 @@ def split2(str, start_pat, end_pat, remove_patterns=False):
             while m2 and in_span(m2.start(), comments):
                 m2 = r2.search(str, m2.end())
             match_end = m2.end() if m2 else len(str)
-            other   += str[other_start:m1.start()]
+            other.append(str[other_start:m1.start()])
             if remove_patterns:
                 keep_start = m1.end()
                 keep_end = m2.start() if m2 else len(str)
             else:
                 keep_start = m1.start()
                 keep_end = m2.end() if m2 else len(str)
-            matched += str[keep_start:keep_end]
+            matched.append(str[keep_start:keep_end])
             next = other_start = match_end
         else:
             next = m1.end()
         m1 = r1.search(str, next)
-    other += str[other_start:]
-    return (matched, other)
+    other.append(str[other_start:])
+    return (''.join(matched), ''.join(other))
+
+# The results are tuples of strings, so they can be cached and shared.
+# Reopening a sample (read_sample is cached too) then skips the splitting.
 
+@functools.lru_cache(maxsize=64)
 def partition(input):
 
+    if not input.strip():
+        return ('', '', '', '', '', '', '\n')  # nothing to split
+
     work = input
 
     # if(Prover9). ... end_if.
 
-    start_pat = r'if\s*\(\s*Prover9\s*\)\s*\.'
-    end_pat   = r'end_if\s*\.'
-    (p9, work) = split2(work, start_pat, end_pat, remove_patterns = True)
+    (p9, work) = split2(work, r_if_prover9, r_end_if, remove_patterns = True)
 
-    # if(Prover9). ... end_if.
+    # if(Mace4). ... end_if.
 
-    start_pat = r'if\s*\(\s*Mace4\s*\)\s*\.'
-    end_pat   = r'end_if\s*\.'
-    (m4, work) = split2(work, start_pat, end_pat, remove_patterns = True)
+    (m4, work) = split2(work, r_if_mace4, r_end_if, remove_patterns = True)
 
     # assumptions|sos
 
-    start_pat = r'formulas\s*\(\s*(assumptions|sos)\s*\)\s*\.'
-    end_pat   = r'end_of_list\s*\.'
-    (assumps, work) = split2(work, start_pat, end_pat, remove_patterns = True)
+    (assumps, work) = split2(work, r_assumptions, r_end_of_list,
+                             remove_patterns = True)
 
     # goals
 
-    start_pat = r'formulas\s*\(\s*goals\s*\)\s*\.'
-    end_pat   = r'end_of_list\s*\.'
-    (goals, work) = split2(work, start_pat, end_pat, remove_patterns = True)
+    (goals, work) = split2(work, r_goals, r_end_of_list,
+                           remove_patterns = True)
 
     # flags, parm, stringparms
 
-    pat = r'((set|clear)\s*\(\s*[a-z0-9_]+\s*\)\s*\.|assign\s*\(\s*[a-z0-9_]+\s*,\s*[a-z0-9_-]+\s*\)\s*\.)'
-    (opt, work) = split1(work, pat)
+    (opt, work) = split1(work, r_options)
 
     # op, redeclare
 
-    pat = r'(op\s*\([^,()]+,[^,()]+,[^,()]+\)\s*\.|redeclare\s*\([^,()]+,[^,()]+\)\s*\.)'
-    (language, work) = split1(work, pat)
+    (language, work) = split1(work, r_language)
 
     # Clean up and return
 
@@ -124,14 +139,17 @@ def partition(input):
                                        
 # end def partition(input):
 
+@functools.lru_cache(maxsize=64)
 def extract_options(input):
 
+    if not input.strip():
+        return ('', '\n')  # nothing to split (e.g., no if(Prover9) part)
+
     work = input
 
     # flags, parm, stringparms
 
-    pat = r'((set|clear)\s*\(\s*[a-z0-9_]+\s*\)\s*\.|assign\s*\(\s*[a-z0-9_-]+\s*,\s*[a-z0-9_]+\s*\)\s*\.)'
-    (opt, work) = split1(work, pat)
+    (opt, work) = split1(work, r_options_only)
 
     work = work.strip() + '\n'
 
@@ -20,6 +20,7 @@
 # system imports
 
 import wx, subprocess
+import functools
 
 # Platforms.  We'll assume GTK, and test for Win32 and Mac when necessary
 
@@ -32,13 +33,14 @@ def Mac():
 def GTK():
     return wx.Platform=='__WXGTK__'
 
+@functools.cache  # runs 'arch', and the answer can't change
 def Mac_ppc():
     if not Mac():
         return False
     else:
         try:
-            arch = subprocess.Popen(['arch'],
-                                    stdout=subprocess.PIPE).communicate()[0]
+            arch = subprocess.Popen(['arch'], stdout=subprocess.PIPE,
+                                    universal_newlines=True).communicate()[0]
         except:
             arch = '??'
         return arch.strip() == 'ppc'
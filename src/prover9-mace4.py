@@ -22,7 +22,7 @@
 # system imports
 
 import os, sys
-import re
+import functools
 
 # Detect if we're running under Wayland and set needed environment variables
 # Check if XDG_SESSION_TYPE exists and is wayland
@@ -44,17 +44,16 @@ import wx.adv
 
 # local imports
 
-import partition_input
-import utilities
 from files import sample_dir, image_dir
 from platforms import Win32, Mac
 from wx_utilities import (
     State, Text_frame, error_dialog, info_dialog, 
     open_dir_style, saveas_dir_style, size_that_fits, 
-    pos_for_center, to_top
+    pos_for_center, to_top, invalidate_screen_size,
+    invalidate_max_width_cache
 )
 from my_setup import Setup_tabs
-from control import Control_panel
+from control import Control_panel, kill_isofilters
 
 Program_name = 'Prover9-Mace4'
 Program_version = '0.5'
@@ -336,6 +335,12 @@ Problems:
  
 """
 
+@functools.lru_cache(maxsize=128)
+def read_sample(path, mtime):
+    # The mtime is part of the key, so an edited sample is read again.
+    with open(path) as f:
+        return f.read()
+
 class Main_frame(wx.Frame):
     """
     This is the primary Frame.
@@ -379,6 +384,7 @@ class Main_frame(wx.Frame):
         self.Bind(wx.EVT_MENU, self.on_saveas, id=wx.ID_SAVEAS)
         self.Bind(wx.EVT_MENU, self.on_close, id=wx.ID_EXIT)
         self.Bind(wx.EVT_CLOSE, self.on_close)
+        self.Bind(wx.EVT_DISPLAY_CHANGED, self.on_display_changed)
         menu_bar.Append(self.fmenu, '&File')
 
         # Preferences menu
@@ -444,34 +450,29 @@ class Main_frame(wx.Frame):
                          dir_path)
         else:
             menu = wx.Menu()
-            entries = os.listdir(dir_path)
-            entries.sort()             # sorts in-place
-            have_file = have_dir = False
-            for x in entries:
-                if os.path.isfile(os.path.join(dir_path, x)):
-                    have_file = True
-            for x in entries:
-                path = os.path.join(dir_path, x)
-                if os.path.isdir(path):
-                    submenu = self.sample_menu(path)
-                    menu.AppendSubMenu(submenu,x)
-                    have_dir = True
-            if have_file and have_dir:
+            # One scandir pass; the entries carry their file types, so
+            # we don't stat each path again below.
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+            files = [e for e in entries if e.is_file()]
+            dirs = [e for e in entries if e.is_dir()]
+            for e in dirs:
+                submenu = self.sample_menu(e.path)
+                menu.AppendSubMenu(submenu,e.name)
+            if files and dirs:
                 menu.AppendSeparator()
-            for x in entries:
-                path = os.path.join(dir_path, x)
-                if os.path.isfile(path) and re.search(r'\.in$', path):
+            for e in files:
+                if e.name.endswith('.in'):
                     id = wx.NewIdRef()
-                    self.probs[id] = path
-                    menu.Append(id, x)
+                    self.probs[id] = e.path
+                    menu.Append(id, e.name)
                     self.Bind(wx.EVT_MENU, self.load_sample, id=id)
             return menu
 
     def load_sample(self, evt):
         path = self.probs[evt.GetId()]
         try:
-            f = open(path)
-            input = f.read()
+            input = read_sample(path, os.path.getmtime(path))
             self.setup.store_new_input(input, None)
         except IOError as e:
             error_dialog('Error opening file %s for reading.' % path)
@@ -484,8 +485,14 @@ class Main_frame(wx.Frame):
         elif self.control.mace4.job_state() in [State.running,State.suspended]:
             error_dialog('You must "Kill" the Mace4 job before quitting.')
         else:
+            kill_isofilters()  # don't leave them running after we're gone
             self.Destroy()
 
+    def on_display_changed(self, evt):
+        invalidate_screen_size()
+        invalidate_max_width_cache()
+        evt.Skip()
+
     def clear_setup(self, evt):
         self.setup.reset()
 
@@ -496,8 +503,8 @@ class Main_frame(wx.Frame):
         if dlg.ShowModal() == wx.ID_OK:
             path = dlg.GetPath()      # full path
             try:
-                f = open(path)
-                input = f.read()
+                with open(path) as f:
+                    input = f.read()
                 self.setup.store_new_input(input, Program_version)
                 self.current_path = path
                 self.fmenu.Enable(wx.ID_SAVE, True)
@@ -513,8 +520,8 @@ class Main_frame(wx.Frame):
         if dlg.ShowModal() == wx.ID_OK:
             path = dlg.GetPath()      # full path
             try:
-                f = open(path)
-                input = f.read()
+                with open(path) as f:
+                    input = f.read()
                 self.setup.append_input(input)
                 # self.current_path = path
                 # self.fmenu.Enable(wx.ID_SAVE, True)
@@ -526,9 +533,9 @@ class Main_frame(wx.Frame):
     def write_input(self, path):
         try:
             input = self.setup.assemble_input()
-            f = open(path, 'w')
-            f.write('%% Saved by %s.\n\n' % Banner)
-            f.write(input)
+            with open(path, 'w') as f:
+                f.write('%% Saved by %s.\n\n' % Banner)
+                f.write(input)
             return True
         except IOError as e:
             error_dialog('Error opening file %s for writing.' % path)
@@ -20,77 +20,58 @@
 import re
 
 def grep(pattern, lines):
+    r = re.compile(pattern)
     result = []
     for line in lines:
         # Handle bytes objects by decoding them to strings
         if isinstance(line, bytes):
             line = line.decode('utf-8', errors='replace')
-        if re.search(pattern, line):
+        if r.search(line):
             result.append(line)
     return result
 
 def grep_last(pattern, lines):
+    r = re.compile(pattern)
     result = None
     for line in lines:
         # Handle bytes objects by decoding them to strings
         if isinstance(line, bytes):
             line = line.decode('utf-8', errors='replace')
-        if re.search(pattern, line):
+        if r.search(line):
             result = line
     return result
 
 def pattern_spans(pattern, string):
-    r = re.compile(pattern)
-    spans = []
-    m = r.search(string, 0)
-    while m:
-        spans.append(m.span())
-        m = r.search(string, m.end())
-    return spans
+    # pattern can be a string or a compiled regular expression
+    return [m.span() for m in re.finditer(pattern, string)]
 
 def comment_spans(s):
-    i = 0
+    # Jump from '%' to '%' with str.find rather than stepping through
+    # the string a character at a time.
     spans = []
     length = len(s)
-    while i < length:
-        if s[i] == '%':
-            start = i
-            if s[i:i+6] == '%BEGIN':
-                # block comment
-                while i <= length and s[i-4:i] != 'END%':
-                    i += 1
-                end = min(i,length)
-            else:
-                # line comment
-                while i < length and s[i] != '\n':
-                    i += 1
-                end = i  # ok if string ends without \n
-            spans.append((start,end))
+    i = s.find('%')
+    while i >= 0:
+        start = i
+        if s.startswith('%BEGIN', i):
+            # block comment
+            end = s.find('END%', i+6)
+            end = length if end < 0 else end+4
         else:
-            i += 1
+            # line comment
+            end = s.find('\n', i)
+            end = length if end < 0 else end  # ok if string ends without \n
+        spans.append((start,end))
+        i = s.find('%', end)
     return spans
-                    
+
 def member(x, b):
-    if b == []:
-        return False
-    elif x == b[0]:
-        return True
-    else:
-        return member(x, b[1:])
+    return x in b
 
 def intersect(a, b):
-    if a == []:
-        return []
-    elif member(a[0], b):
-        return [a[0]] + intersect(a[1:], b)
-    else:
-        return intersect(a[1:], b)
-
-def remove_reg_exprs(exprs, str):
-    pat = '|'.join(exprs)
-    r = re.compile(pat)
-    str = r.sub('', str)
-    return str
+    "Members of a (in order) that are also in b."
+    b = set(b)
+    return [x for x in a if x in b]
 
     
         
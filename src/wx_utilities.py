@@ -19,7 +19,7 @@
 
 # system imports
 
-import os, re, wx
+import os, wx
 
 # local imports
 
@@ -41,30 +41,44 @@ def to_top(w):
     return w
 
 def absolute_position(w):
-    (x,y) = w.GetPosition()
-    if not w.GetParent():
-        return (x,y)
-    else:
-        (a,b) = absolute_position(w.GetParent())
-        return (x+a, y+b)
+    (x,y) = (0,0)
+    while w:
+        (a,b) = w.GetPosition()
+        (x,y) = (x+a, y+b)
+        w = w.GetParent()
+    return (x,y)
+
+# The screen size is asked for each time a frame is placed; get it from
+# the system only once, and again after the display changes.
+
+screen_size_cache = None
+
+def screen_size():
+    global screen_size_cache
+    if not screen_size_cache:
+        screen_size_cache = (wx.SystemSettings.GetMetric(wx.SYS_SCREEN_X),
+                             wx.SystemSettings.GetMetric(wx.SYS_SCREEN_Y))
+    return screen_size_cache
+
+def invalidate_screen_size():
+    "Call this on EVT_DISPLAY_CHANGED."
+    global screen_size_cache
+    screen_size_cache = None
 
 def size_that_fits(recommended_size):
     (r_width, r_height) = recommended_size
-    screen_width  = wx.SystemSettings.GetMetric(wx.SYS_SCREEN_X)
-    screen_height  = wx.SystemSettings.GetMetric(wx.SYS_SCREEN_Y)
+    (screen_width, screen_height) = screen_size()
     return (min(r_width, screen_width), min(r_height, screen_height))
 
 def pos_for_center(size):
     (frame_width, frame_height) = size
-    screen_width  = wx.SystemSettings.GetMetric(wx.SYS_SCREEN_X)
-    screen_height  = wx.SystemSettings.GetMetric(wx.SYS_SCREEN_Y)
+    (screen_width, screen_height) = screen_size()
     x = screen_width//2 - frame_width//2
     y = screen_height//2 - frame_height//2
     return (max(x,0),max(y,0))
 
 def center_of_screen():
-    screen_width  = wx.SystemSettings.GetMetric(wx.SYS_SCREEN_X)
-    screen_height  = wx.SystemSettings.GetMetric(wx.SYS_SCREEN_Y)
+    (screen_width, screen_height) = screen_size()
     return (screen_width//2, screen_height//2)
 
 def error_dialog(message):
@@ -77,21 +91,30 @@ def info_dialog(message):
     dlg.ShowModal()
     dlg.Destroy()
 
+def start_dir(current_path):
+    "Directory of the current file, if any, else the working directory."
+    if current_path:
+        return os.path.dirname(current_path)
+    else:
+        return os.getcwd()
+
+# File dialog styles
+
+Open_style   = wx.FD_OPEN
+Saveas_style = wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT
+
 def open_dir_style(current_path):
     # Mac and Win32 remember directory, even after quitting program;
     # else (GTK), use our
-    style = wx.FD_OPEN
+    style = Open_style
     if Mac() or Win32():
         return ('', style)
     else:
         # return (os.getcwd(), wx.OPEN | wx.CHANGE_DIR)
-        if current_path:
-            return (os.path.dirname(current_path), style)
-        else:
-            return (os.getcwd(), style)
+        return (start_dir(current_path), style)
 
 def saveas_dir_style(current_path):
-    style = wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT
+    style = Saveas_style
     if Win32():  # Win32 uses dir remembered from 'open'
         return ('', style)
     elif Mac():  # Mac doesn't use dir remembered from 'open'
@@ -101,17 +124,29 @@ def saveas_dir_style(current_path):
             return ('', wx.FD_SAVE)
     else:        # GTK doesn't remember
         # return (os.getcwd(), style | wx.CHANGE_DIR)
-        if current_path:
-            return (os.path.dirname(current_path), style)
-        else:
-            return (os.getcwd(), style)
+        return (start_dir(current_path), style)
+
+# Text measurement is a native call, so remember the results,
+# keyed by (font, strings).
+
+max_width_cache = {}
 
 def max_width(strings, window):
-    max_wid = 0
-    for s in strings:
-        width = window.GetTextExtent(s)[0]
-        max_wid = max(max_wid, width)
-    return max_wid
+    strings = tuple(strings)
+    key = (window.GetFont().GetNativeFontInfoDesc(), strings)
+    if key not in max_width_cache:
+        # window.GetTextExtent makes a new DC on each call; share one,
+        # and measure the distinct strings as the lines of one text, whose
+        # width is that of the widest line.
+        dc = wx.ClientDC(window)
+        dc.SetFont(window.GetFont())
+        text = '\n'.join(set(strings))
+        max_width_cache[key] = dc.GetMultiLineTextExtent(text)[0]
+    return max_width_cache[key]
+
+def invalidate_max_width_cache():
+    "Call this if text extents change (e.g., new display resolution)."
+    max_width_cache.clear()
 
 class Text_frame(wx.Frame):
     def __init__(self, parent, font, title, text,
@@ -127,7 +162,9 @@ class Text_frame(wx.Frame):
 
         self.extension = extension
         self.saved_flag = saved_flag
-        self.text = text
+        # The TextCtrl holds the text; keep our own copy only for the
+        # extra operations (Reformat, Isofilter), which read it back.
+        self.text = text if extra_operations else None
 
         if saveas:
             saveas_btn = wx.Button(self, -1, 'Save as...')
@@ -147,8 +184,11 @@ class Text_frame(wx.Frame):
                                wx.TE_RICH2)  # TE_RICH2 allows > 32K in Win32
         self.txt.SetFont(font)
         
+        # Freeze, so a large text is laid out and drawn once.
+        self.txt.Freeze()
         self.txt.AppendText(text)
         self.txt.ShowPosition(0)
+        self.txt.Thaw()
  
         sub_sizer = wx.BoxSizer(wx.HORIZONTAL)
         if saveas:
@@ -172,7 +212,7 @@ class Text_frame(wx.Frame):
 
         if to_top(self).current_path and self.extension:
             dfile = os.path.basename(to_top(self).current_path)
-            dfile = re.sub(r'\.[^.]*$', '', dfile)  # get rid of any extension
+            dfile = os.path.splitext(dfile)[0]  # get rid of any extension
             dfile = '%s.%s' % (dfile,self.extension)    # append new extension
         else:
             dfile = ''
@@ -182,8 +222,8 @@ class Text_frame(wx.Frame):
         if dlg.ShowModal() == wx.ID_OK:
             path = dlg.GetPath()      # full path
             try:
-                f = open(path, 'w')
-                f.write(self.txt.GetValue())
+                with open(path, 'w') as f:
+                    f.write(self.txt.GetValue())
                 # Do not update to_top(self).current_path
                 if self.saved_flag:
                     self.saved_flag[0] = True
@@ -196,21 +236,19 @@ class Text_frame(wx.Frame):
         self.Close()
 
     def hilite_error(self):
-        start = self.txt.GetValue().find('%%START ERROR%%')
+        attr = wx.TextAttr('RED', wx.Colour(200,200,255))
+        text = self.txt.GetValue()  # copy the (maybe large) text only once
+        start = text.find('%%START ERROR%%')
         if start > 0:
-            end = self.txt.GetValue().find('%%END ERROR%%', start)
+            end = text.find('%%END ERROR%%', start)
             if end > 0:
-                self.txt.SetStyle(start+15, end,
-                                  wx.TextAttr('RED',
-                                              wx.Colour(200,200,255)))
+                self.txt.SetStyle(start+15, end, attr)
         else:
-            start = self.txt.GetValue().find('%%ERROR:')
+            start = text.find('%%ERROR:')
             if start > 0:
-                end = self.txt.GetValue().find('\n', start)
+                end = text.find('\n', start)
                 if end > 0:
-                    self.txt.SetStyle(start+8, end,
-                                      wx.TextAttr('RED',
-                                                  wx.Colour(200,200,255)))
+                    self.txt.SetStyle(start+8, end, attr)
             
 
 # END class Text_frame(wx.Frame)
@@ -268,12 +306,15 @@ class Mini_info(wx.MiniFrame):
         self.Destroy()
 
     def update(self, items):
-        i = 0
-        for (_,val) in items:
-            lab = self.val_labels[i]
-            lab.SetLabel(str(val))
-            i += 1
-        self.Fit()
+        # Called every second; touch only the values that changed.
+        changed = False
+        for (lab,(_,val)) in zip(self.val_labels, items):
+            val = str(val)
+            if lab.GetLabel() != val:
+                lab.SetLabel(val)
+                changed = True
+        if changed:
+            self.Fit()
         
 # END class Mini_info(wx.MiniFrame)
 
@@ -296,6 +337,42 @@ class Invoke_event(wx.PyEvent):
 
 # END class Invoke_event(PyEvent)
 
+class Busy_bar_timer(wx.Timer):
+    """
+    One timer drives all of the running Busy_bars with the same delay,
+    rather than each bar having a timer of its own.
+    """
+    def __init__(self, delay):
+        wx.Timer.__init__(self)
+        self.delay = delay
+        self.bars = set()
+
+    def add(self, bar):
+        self.bars.add(bar)
+        if not self.IsRunning():
+            self.Start(self.delay)  # milliseconds
+
+    def remove(self, bar):
+        self.bars.discard(bar)
+        if not self.bars:
+            self.Stop()
+
+    def Notify(self):
+        for bar in list(self.bars):
+            if bar:
+                bar.update_bar(None)
+            else:
+                self.remove(bar)  # bar was destroyed while running
+
+# END class Busy_bar_timer(wx.Timer)
+
+busy_bar_timers = {}  # delay -> Busy_bar_timer
+
+def busy_bar_timer(delay):
+    if delay not in busy_bar_timers:
+        busy_bar_timers[delay] = Busy_bar_timer(delay)
+    return busy_bar_timers[delay]
+
 class Busy_bar(wx.Gauge):
 
     def __init__(self, parent, width=200, height=16,
@@ -308,37 +385,29 @@ class Busy_bar(wx.Gauge):
         self.state = State.ready
         self.position = 40
         self.direction = 1
-        self.timer = None
 
     def update_bar(self, evt):
-        # This is run periodically, triggered by the timer in self.start().
+        # This is run periodically, triggered by the shared Busy_bar_timer.
 
         self.position += self.direction
-        if self.position >= 60:
-            self.direction = -1
-        elif self.position <= 40:
-            self.direction = 1
+        if not 40 < self.position < 60:  # bounce at either end
+            self.direction = -self.direction
 
         self.SetValue(self.position)
 
     def start(self):
-        # start timer
-        if self.timer == None:
-            self.timer = wx.Timer(self, -1)
-            # Replace deprecated EVT_TIMER with Bind
-            self.Bind(wx.EVT_TIMER, self.update_bar, self.timer)
-            self.timer.Start(self.delay)  # milliseconds
+        busy_bar_timer(self.delay).add(self)
         self.state = State.running
 
     def pause(self):
-        self.timer.Stop()
+        busy_bar_timer(self.delay).remove(self)
         self.state = State.suspended
 
     def resume(self):
         self.start()
         
     def stop(self):
-        self.timer.Stop()
+        busy_bar_timer(self.delay).remove(self)
         self.SetValue(0)
         self.position = 40
         self.direction = 1